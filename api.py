@@ -8,7 +8,7 @@ from urllib.parse import parse_qs
 from quart import (
     Blueprint,
     Response,
-    jsonify as _jsonify,
+    jsonify,
     redirect,
     render_template,
     request,
@@ -16,32 +16,25 @@ from quart import (
 )
 from swagger_ui import api_doc
 
-from .tts.tts_base import TTSBase
+from .tts.tts_base import TTSBase, Voice
 from .logger import LOGGER as _LOGGER
 
 from offlinetts.to_wav import (
+    stream_wav,
     text_to_wav,
 )
 
-def clean_nones(value):
-    """
-    Recursively remove all None values from dictionaries and lists, and returns
-    the result as a new dictionary or list.
-    """
-    if isinstance(value, list):
-        return [clean_nones(x) for x in value if x is not None]
-    elif isinstance(value, dict):
-        return {
-            key: clean_nones(val)
-            for key, val in value.items()
-            if val is not None
-        }
-    else:
-        return value
+_VOICE_FIELDS = tuple(field.name for field in dataclasses.fields(Voice))
+
+def voice_to_dict(voice: Voice) -> typing.Dict[str, typing.Any]:
+    """Convert a voice to a JSON-ready dictionary, leaving out None fields."""
+    voice_dict: typing.Dict[str, typing.Any] = {}
+    for key in _VOICE_FIELDS:
+        value = getattr(voice, key)
+        if value is not None:
+            voice_dict[key] = value
 
-def jsonify(data, **kwargs) -> "Response":
-    data = clean_nones(data)
-    return _jsonify(data, **kwargs)
+    return voice_dict
 
 _DIR = Path(__file__).parent
 _VERSION = (_DIR / "VERSION").read_text().strip()
@@ -50,6 +43,11 @@ def get_blueprint(app) -> Blueprint:
 
     blueprint = Blueprint('api', __name__)
 
+    @blueprint.before_app_serving
+    async def warmup_tts():
+        """Load TTS systems and models in the background while serving."""
+        TTSBase.prefetch()
+
     @blueprint.route("/api/voices")
     async def app_voices() -> Response:
         """Get available voices."""
@@ -59,7 +57,7 @@ def get_blueprint(app) -> Blueprint:
         tts_names = set(request.args.getlist("tts_name"))
 
         voices: typing.Dict[str, typing.Any] = {}
-        for tts_name, tts in TTSBase._TTSList.items():
+        for tts_name, tts in await TTSBase.items_async():
             if tts_names and (tts_name not in tts_names):
                 # Skip TTS
                 continue
@@ -79,7 +77,7 @@ def get_blueprint(app) -> Blueprint:
 
                 # Prepend TTS system name to voice ID
                 full_id = f"{tts_name}:{voice.id}"
-                voices[full_id] = dataclasses.asdict(voice)
+                voices[full_id] = voice_to_dict(voice)
 
                 # Add TTS name
                 voices[full_id]["tts_name"] = tts_name
@@ -93,13 +91,12 @@ def get_blueprint(app) -> Blueprint:
         tts_names = set(request.args.getlist("tts_name"))
         languages: typing.Set[str] = set()
 
-        for tts_name, tts in TTSBase._TTSList.items():
+        for tts_name, tts in await TTSBase.items_async():
             if tts_names and (tts_name not in tts_names):
                 # Skip TTS
                 continue
 
-            async for voice in tts.voices():
-                languages.add(voice.language)
+            languages.update([voice.language async for voice in tts.voices()])
 
         return jsonify(list(languages))
 
@@ -144,7 +141,7 @@ def get_blueprint(app) -> Blueprint:
             "verbalize_currency": ssml_currency,
         }
 
-        wav_bytes = await text_to_wav(
+        wav_chunks = stream_wav(
             text=text,
             voice=voice,
             lang=lang,
@@ -153,7 +150,16 @@ def get_blueprint(app) -> Blueprint:
             ssml_args=ssml_args,
         )
 
-        return Response(wav_bytes, mimetype="audio/wav")
+        # Wait for the first line before responding, so that synthesis
+        # errors are still reported by the error handler.
+        first_chunk = await wav_chunks.__anext__()
+
+        async def send_wav_chunks():
+            yield first_chunk
+            async for wav_chunk in wav_chunks:
+                yield wav_chunk
+
+        return Response(send_wav_chunks(), mimetype="audio/wav")
 
 
     # -----------------------------------------------------------------------------
@@ -184,7 +190,7 @@ def get_blueprint(app) -> Blueprint:
     async def api_voices():
         """MaryTTS-compatible /voices endpoint"""
         voices = []
-        for tts_name, tts in TTSBase._TTSList.items():
+        for tts_name, tts in await TTSBase.items_async():
             async for voice in tts.voices():
                 # Prepend TTS system name to voice ID
                 full_id = f"{tts_name}:{voice.id}"
@@ -5,6 +5,7 @@ LOG_LEVEL = logging.INFO
 LOGGER = logging.getLogger("tts")
 
 def setLogLevel(logLevel):
+  global LOG_LEVEL
   if type(logLevel) is str:
     logLevel = logging._nameToLevel.get(logLevel)
   if logLevel:
@@ -3,29 +3,220 @@ import re
 import typing
 import tempfile
 import hashlib
-import io
-import wave
 import time
 import math
+import sqlite3
+import struct
+import threading
+import functools
 import gruut
+import numpy as np
 
+from collections import OrderedDict
 from pathlib import Path
 
-from .tts import TTSBase
+from .tts import PCM_AND_SAMPLE_RATE, TTSBase
 from .logger import LOGGER as _LOGGER
 
-WAV_AND_SAMPLE_RATE = typing.Tuple[bytes, int]
+# Optional in-process resamplers, in order of preference.
+# sox is run as a subprocess when neither is installed.
+try:
+    import soxr
+except ImportError:
+    soxr = None
+
+try:
+    from scipy import signal as _signal
+except ImportError:
+    _signal = None
+
+# SIMD-accelerated cache key hashing when blake3 is installed
+try:
+    from blake3 import blake3 as _cache_hasher
+except ImportError:
+    _cache_hasher = hashlib.sha256
+
+
+# Output WAV format
+_SAMPLE_WIDTH = 2  # bytes (16-bit)
+_N_CHANNELS = 1  # mono
+
+# Data size in the header of a streamed WAV, whose length isn't known yet
+_STREAM_DATA_SIZE = 0xFFFFFFFF - 36
+
+# en-US -> en
+_LANG_SPLIT_RE = re.compile(r"[-_]")
+_LINE_RE = re.compile(r"[^\r\n]+")
 
 # Set up WAV cache
 _CACHE_DIR: typing.Optional[Path] = None
 _CACHE_TEMP_DIR: typing.Optional[tempfile.TemporaryDirectory] = None
+_CACHE_INDEX: typing.Optional["WavCacheIndex"] = None
+
+# In-process LRU of synthesized WAVs, checked before the disk cache
+_MEM_CACHE: "OrderedDict[str, bytes]" = OrderedDict()
+_MEM_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+_MEM_CACHE_BYTES: int = 0
+
+# Maximum number of lines synthesized at once by thread-safe TTS systems
+_LINE_CONCURRENCY: int = 4
+
+# Syntheses currently running, keyed by cache key and use_cache
+_INFLIGHT: typing.Dict[typing.Tuple[str, bool], "_SharedSynthesis"] = {}
+
+class WavCacheIndex:
+    """SQLite index of the WAV files in a cache directory.
+
+    Tracks size and access time of each file to evict the least recently
+    used ones over max_bytes, and expires files older than ttl seconds.
+    Methods block, so run them in an executor.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        max_bytes: typing.Optional[int] = None,
+        ttl: typing.Optional[float] = None,
+    ):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(cache_dir / "index.db"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+
+        is_new = not self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'entries'"
+        ).fetchone()
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, path TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created_at REAL NOT NULL, last_accessed REAL NOT NULL, voice TEXT)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS entries_last_accessed ON entries (last_accessed)"
+            )
+
+            if is_new:
+                # Adopt WAV files cached before the index existed
+                for wav_path in cache_dir.glob("*.wav"):
+                    wav_stat = wav_path.stat()
+                    self._db.execute(
+                        "INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?, ?, NULL)",
+                        (
+                            wav_path.stem,
+                            wav_path.name,
+                            wav_stat.st_size,
+                            wav_stat.st_mtime,
+                            wav_stat.st_mtime,
+                        ),
+                    )
+
+    def load(self, cache_key: str) -> typing.Optional[bytes]:
+        """Read a cached WAV, or None if missing or expired"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT path, created_at FROM entries WHERE key = ?", (cache_key,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        path, created_at = row
+        now = time.time()
+        if (self.ttl is not None) and ((now - created_at) > self.ttl):
+            self._remove(cache_key, path)
+            return None
+
+        try:
+            wav_bytes = (self.cache_dir / path).read_bytes()
+        except FileNotFoundError:
+            self._remove(cache_key, path)
+            return None
+
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE entries SET last_accessed = ? WHERE key = ?", (now, cache_key)
+            )
+
+        return wav_bytes
+
+    def store(self, cache_key: str, wav_bytes: bytes, voice: typing.Optional[str] = None):
+        """Write a WAV to the cache, evicting old ones if over budget"""
+        path = f"{cache_key}.wav"
+        (self.cache_dir / path).write_bytes(wav_bytes)
+
+        now = time.time()
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (cache_key, path, len(wav_bytes), now, now, voice),
+            )
+            evicted_paths = self._evict(now)
+
+        for evicted_path in evicted_paths:
+            (self.cache_dir / evicted_path).unlink(missing_ok=True)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _remove(self, cache_key: str, path: str):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM entries WHERE key = ?", (cache_key,))
+
+        (self.cache_dir / path).unlink(missing_ok=True)
+
+    def _evict(self, now: float) -> typing.List[str]:
+        """Drop expired and least recently used entries. Caller holds the lock."""
+        evicted: typing.List[typing.Tuple[str, str]] = []
+        if self.ttl is not None:
+            evicted.extend(
+                self._db.execute(
+                    "SELECT key, path FROM entries WHERE created_at < ?",
+                    (now - self.ttl,),
+                )
+            )
+
+        if self.max_bytes is not None:
+            evicted_keys = set(key for key, _path in evicted)
+            total_bytes = 0
+            for key, path, size in self._db.execute(
+                "SELECT key, path, size FROM entries ORDER BY last_accessed DESC"
+            ):
+                if key in evicted_keys:
+                    continue
+
+                total_bytes += size
+                if total_bytes > self.max_bytes:
+                    evicted.append((key, path))
+
+        self._db.executemany(
+            "DELETE FROM entries WHERE key = ?", [(key,) for key, _path in evicted]
+        )
+        return [path for _key, path in evicted]
 
 def cleanCache():
     # Clean up WAV cache
+    global _CACHE_DIR, _CACHE_TEMP_DIR, _CACHE_INDEX
+    if _CACHE_INDEX is not None:
+        _CACHE_INDEX.close()
     if _CACHE_TEMP_DIR is not None:
         _CACHE_TEMP_DIR.cleanup()
-
-def setCacheDir(cache_dir: typing.Optional[typing.Union[str, bool]]):
+    # Later lookups skip the disk cache
+    _CACHE_DIR = None
+    _CACHE_TEMP_DIR = None
+    _CACHE_INDEX = None
+
+def setCacheDir(
+    cache_dir: typing.Optional[typing.Union[str, bool]],
+    max_bytes: typing.Optional[int] = None,
+    ttl: typing.Optional[float] = None,
+):
+    global _CACHE_DIR, _CACHE_TEMP_DIR
     if type(cache_dir) is str:
         if cache_dir.lower() in ['true', '1', 't', 'y', 'yes', 'ok']:
             cache_dir = True
@@ -45,11 +236,129 @@ def setCacheDir(cache_dir: typing.Optional[typing.Union[str, bool]]):
         _CACHE_DIR = None       # type: ignore
         _CACHE_TEMP_DIR = None  # type: ignore
     _LOGGER.debug("Caching WAV files in %s", _CACHE_DIR)
+    _open_cache_index(_CACHE_DIR, max_bytes, ttl)
+
+def _open_cache_index(
+    cache_dir: typing.Optional[Path],
+    max_bytes: typing.Optional[int] = None,
+    ttl: typing.Optional[float] = None,
+):
+    global _CACHE_INDEX
+    if _CACHE_INDEX is not None:
+        _CACHE_INDEX.close()
+        _CACHE_INDEX = None
+
+    if cache_dir is not None:
+        _CACHE_INDEX = WavCacheIndex(cache_dir, max_bytes=max_bytes, ttl=ttl)
+        _LOGGER.debug("WAV cache limits: %s byte(s), %s second(s)", max_bytes, ttl)
+
+def setMemCacheSize(max_bytes: int):
+    """Set the byte budget of the in-process WAV cache (0 disables it)"""
+    global _MEM_CACHE_MAX_BYTES
+    _MEM_CACHE_MAX_BYTES = max(0, int(max_bytes))
+    _mem_cache_evict()
+    _LOGGER.debug("Memory WAV cache size: %s byte(s)", _MEM_CACHE_MAX_BYTES)
+
+def setLineConcurrency(max_lines: int):
+    """Set how many lines thread-safe TTS systems may synthesize at once"""
+    global _LINE_CONCURRENCY
+    _LINE_CONCURRENCY = max(1, int(max_lines))
+    _LOGGER.debug("Line concurrency: %s", _LINE_CONCURRENCY)
+
+def getLineConcurrency() -> int:
+    """Get how many lines thread-safe TTS systems may synthesize at once"""
+    return _LINE_CONCURRENCY
+
+def _mem_cache_get(cache_key: str) -> typing.Optional[bytes]:
+    wav_bytes = _MEM_CACHE.get(cache_key)
+    if wav_bytes is not None:
+        _MEM_CACHE.move_to_end(cache_key)
+    return wav_bytes
+
+def _mem_cache_put(cache_key: str, wav_bytes: bytes):
+    global _MEM_CACHE_BYTES
+    if len(wav_bytes) > _MEM_CACHE_MAX_BYTES:
+        return
+    old_wav_bytes = _MEM_CACHE.pop(cache_key, None)
+    if old_wav_bytes is not None:
+        _MEM_CACHE_BYTES -= len(old_wav_bytes)
+    _MEM_CACHE[cache_key] = wav_bytes
+    _MEM_CACHE_BYTES += len(wav_bytes)
+    _mem_cache_evict()
+
+def _mem_cache_evict():
+    """Drop least recently used WAVs until the byte budget is met"""
+    global _MEM_CACHE_BYTES
+    while _MEM_CACHE and (_MEM_CACHE_BYTES > _MEM_CACHE_MAX_BYTES):
+        _cache_key, wav_bytes = _MEM_CACHE.popitem(last=False)
+        _MEM_CACHE_BYTES -= len(wav_bytes)
 
 def get_cache_key(text: str, voice: str, settings: str = "") -> str:
     """Get hashed WAV name for cache"""
-    cache_key_str = f"{text}-{voice}-{settings}"
-    return hashlib.sha256(cache_key_str.encode("utf-8")).hexdigest()
+    hasher = _cache_hasher()
+    hasher.update(text.encode("utf-8"))
+    hasher.update(b"\0")
+    hasher.update(voice.encode("utf-8"))
+    hasher.update(b"\0")
+    hasher.update(settings.encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def _get_wav_cache_key(
+    text: str,
+    voice: str,
+    denoiser_strength: typing.Optional[float] = None,
+    noise_scale: typing.Optional[float] = None,
+    length_scale: typing.Optional[float] = None,
+    ssml: bool = False,
+    lang: typing.Optional[str] = None,
+    vocoder: typing.Optional[str] = None,
+    ssml_args: typing.Optional[typing.Dict[str, typing.Any]] = None,
+) -> str:
+    # Ensure unique cache id for different denoiser values
+    settings_str = f"denoiser_strength={denoiser_strength};noise_scale={noise_scale};length_scale={length_scale};ssml={ssml}"
+    # Only added when they change the output, so other keys stay the same
+    if vocoder is not None:
+        settings_str += f";vocoder={vocoder}"
+    if ssml:
+        # Language of untagged text and gruut settings
+        settings_str += f";lang={lang};ssml_args={sorted((ssml_args or {}).items())}"
+    return get_cache_key(text=text, voice=voice, settings=settings_str)
+
+async def _load_cached_wav(cache_key: str) -> typing.Optional[bytes]:
+    """Look up a WAV in the memory cache, then in the cache directory"""
+    wav_bytes = _mem_cache_get(cache_key)
+    if wav_bytes is not None:
+        _LOGGER.debug("Loading from memory cache: %s", cache_key)
+        return wav_bytes
+
+    if (_CACHE_DIR is not None) and (_CACHE_INDEX is not None):
+        try:
+            loop = asyncio.get_running_loop()
+            wav_bytes = await loop.run_in_executor(None, _CACHE_INDEX.load, cache_key)
+            if wav_bytes is not None:
+                _LOGGER.debug("Loaded from cache: %s", cache_key)
+                _mem_cache_put(cache_key, wav_bytes)
+                return wav_bytes
+        except Exception:
+            # Allow synthesis to proceed if cache fails
+            _LOGGER.exception("cache load")
+
+    return None
+
+async def _save_cached_wav(cache_key: str, wav_bytes: bytes, voice: str):
+    _mem_cache_put(cache_key, wav_bytes)
+
+    if (_CACHE_DIR is not None) and (_CACHE_INDEX is not None):
+        try:
+            _LOGGER.debug("Writing to cache: %s", cache_key)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(
+                None, _CACHE_INDEX.store, cache_key, wav_bytes, voice,
+            )
+        except Exception:
+            # Continue if a cache write fails
+            _LOGGER.exception("cache save")
 
 
 async def text_to_wav(
@@ -66,170 +375,458 @@ async def text_to_wav(
 ) -> bytes:
     """Runs TTS for each line and accumulates all audio into a single WAV."""
     if not voice:
-        voice = TTSBase.get_preferred_voice(lang)
+        voice = await TTSBase.get_preferred_voice_async(lang)
     assert voice, "No voice provided"
 
+    cache_key = _get_wav_cache_key(
+        text,
+        voice,
+        denoiser_strength,
+        noise_scale,
+        length_scale,
+        ssml,
+        lang=lang,
+        vocoder=vocoder,
+        ssml_args=ssml_args,
+    )
+
     # Look up in cache
-    wav_bytes = bytes()
-    cache_path: typing.Optional[Path] = None
-
-    if use_cache and (_CACHE_DIR is not None):
-        # Ensure unique cache id for different denoiser values
-        settings_str = f"denoiser_strength={denoiser_strength};noise_scale={noise_scale};length_scale={length_scale};ssml={ssml}"
-        cache_key = get_cache_key(text=text, voice=voice, settings=settings_str)
-        cache_path = _CACHE_DIR / f"{cache_key}.wav"
-        if cache_path.is_file():
-            try:
-                _LOGGER.debug("Loading from cache: %s", cache_path)
-                wav_bytes = cache_path.read_bytes()
-                return wav_bytes
-            except Exception:
-                # Allow synthesis to proceed if cache fails
-                _LOGGER.exception("cache load")
+    if use_cache:
+        wav_bytes = await _load_cached_wav(cache_key)
+        if wav_bytes is not None:
+            return wav_bytes
+
+    # Share an identical synthesis that is already running
+    synthesis = _share_synthesis(
+        cache_key,
+        use_cache,
+        text=text,
+        voice=voice,
+        lang=lang,
+        vocoder=vocoder,
+        denoiser_strength=denoiser_strength,
+        noise_scale=noise_scale,
+        length_scale=length_scale,
+        ssml=ssml,
+        ssml_args=ssml_args,
+    )
+    synthesis.join()
+    try:
+        return await synthesis.wav()
+    finally:
+        synthesis.leave()
 
-    # -------------------------------------------------------------------------
-    # Synthesis
-    # -------------------------------------------------------------------------
 
-    # Synthesize text and accumulate into a single WAV file.
-    _LOGGER.info("Synthesizing with %s (%s char(s))... ssml:%s", voice, len(text), ssml)
+async def stream_wav(
+    text: str,
+    voice: str,
+    lang: str = TTSBase.default_lang,
+    vocoder: typing.Optional[str] = None,
+    denoiser_strength: typing.Optional[float] = None,
+    noise_scale: typing.Optional[float] = None,
+    length_scale: typing.Optional[float] = None,
+    use_cache: bool = True,
+    ssml: bool = False,
+    ssml_args: typing.Optional[typing.Dict[str, typing.Any]] = None,
+) -> typing.AsyncIterator[bytes]:
+    """Runs TTS like text_to_wav, but yields the WAV as each line is synthesized.
+
+    The header is sent before the total size is known and the output uses
+    the sample rate of the first synthesized line.
+    """
+    if not voice:
+        voice = await TTSBase.get_preferred_voice_async(lang)
+    assert voice, "No voice provided"
+
+    cache_key = _get_wav_cache_key(
+        text,
+        voice,
+        denoiser_strength,
+        noise_scale,
+        length_scale,
+        ssml,
+        lang=lang,
+        vocoder=vocoder,
+        ssml_args=ssml_args,
+    )
+
+    # Look up in cache
+    if use_cache:
+        wav_bytes = await _load_cached_wav(cache_key)
+        if wav_bytes is not None:
+            yield wav_bytes
+            return
+
+    # Follow an identical synthesis that is already running
+    synthesis = _share_synthesis(
+        cache_key,
+        use_cache,
+        text=text,
+        voice=voice,
+        lang=lang,
+        ssml=ssml,
+        ssml_args=ssml_args,
+        # Larynx settings
+        vocoder=vocoder,
+        denoiser_strength=denoiser_strength,
+        noise_scale=noise_scale,
+        length_scale=length_scale,
+    )
     start_time = time.time()
 
+    synthesis.join()
+    try:
+        final_sample_rate: typing.Optional[int] = None
+        async for fragment in synthesis.follow():
+            if final_sample_rate is None:
+                _samples, final_sample_rate = fragment
+                yield make_wav_header(
+                    _STREAM_DATA_SIZE, final_sample_rate, _SAMPLE_WIDTH, _N_CHANNELS,
+                )
+
+            samples = await fragment_to_pcm(fragment, final_sample_rate)
+            yield samples.tobytes()
+    finally:
+        synthesis.leave()
+
+    end_time = time.time()
+    _LOGGER.debug("Streamed audio in %s second(s)", end_time - start_time)
+
+
+class _SharedSynthesis:
+    """Synthesis followed by every identical request while it runs.
+
+    Runs in its own task, so a request that goes away doesn't stop it for
+    the others. It is cancelled once no request follows it anymore.
+    """
+
+    def __init__(
+        self,
+        cache_key: str,
+        voice: str,
+        use_cache: bool,
+        fragments: typing.AsyncGenerator[PCM_AND_SAMPLE_RATE, None],
+    ):
+        self.cache_key = cache_key
+        self.voice = voice
+        # Reuse cached lines and save the WAV to the cache when done
+        self.use_cache = use_cache
+        # Synthesized so far, in order
+        self.fragments: typing.List[PCM_AND_SAMPLE_RATE] = []
+        self.wav_bytes: typing.Optional[bytes] = None
+        self.error: typing.Optional[BaseException] = None
+        self.done = False
+        self._followers = 0
+        # Replaced after each change, set to wake up followers
+        self._changed = asyncio.Event()
+        self._task = asyncio.create_task(self._run(fragments))
+
+    def join(self):
+        self._followers += 1
+
+    def leave(self):
+        self._followers -= 1
+        if (self._followers <= 0) and (not self.done):
+            # Nobody is waiting for the audio anymore
+            if _INFLIGHT.get((self.cache_key, self.use_cache)) is self:
+                del _INFLIGHT[(self.cache_key, self.use_cache)]
+            self._task.cancel()
+
+    async def wav(self) -> bytes:
+        """Wait for the whole WAV, using the maximum sample rate"""
+        while not self.done:
+            await self._changed.wait()
+
+        if self.error is not None:
+            raise self.error
+
+        assert self.wav_bytes is not None
+        return self.wav_bytes
+
+    async def follow(self) -> typing.AsyncIterator[PCM_AND_SAMPLE_RATE]:
+        """Yield the fragments synthesized so far, then the rest as they come"""
+        index = 0
+        while True:
+            while index < len(self.fragments):
+                yield self.fragments[index]
+                index += 1
+
+            if self.done:
+                break
+
+            await self._changed.wait()
+
+        if self.error is not None:
+            raise self.error
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def _run(self, fragments: typing.AsyncGenerator[PCM_AND_SAMPLE_RATE, None]):
+        start_time = time.time()
+        try:
+            async for fragment in fragments:
+                self.fragments.append(fragment)
+                self._notify()
+
+            assert self.fragments, "No audio returned from synthesis"
+            self.wav_bytes = await _join_fragments(self.fragments)
+        except asyncio.CancelledError as err:
+            self.error = err
+            raise
+        except Exception as err:
+            # Followers re-raise it themselves
+            self.error = err
+        finally:
+            await fragments.aclose()
+            self.done = True
+            if _INFLIGHT.get((self.cache_key, self.use_cache)) is self:
+                del _INFLIGHT[(self.cache_key, self.use_cache)]
+            self._notify()
+
+        if self.error is not None:
+            return
+
+        end_time = time.time()
+        _LOGGER.debug(
+            "Synthesized %s byte(s) in %s second(s)",
+            len(self.wav_bytes),
+            end_time - start_time,
+        )
+
+        if self.use_cache:
+            await _save_cached_wav(self.cache_key, self.wav_bytes, self.voice)
+
+
+def _share_synthesis(
+    cache_key: str,
+    use_cache: bool,
+    text: str,
+    voice: str,
+    lang: str,
+    ssml: bool = False,
+    ssml_args: typing.Optional[typing.Dict[str, typing.Any]] = None,
+    **say_args,
+) -> _SharedSynthesis:
+    """Get the running synthesis with cache_key, or start synthesizing text (or SSML)"""
+    # Requests with use_cache=False don't get audio of cached lines
+    synthesis = _INFLIGHT.get((cache_key, use_cache))
+    if synthesis is not None:
+        _LOGGER.debug("Waiting for in-flight synthesis: %s", cache_key)
+        return synthesis
+
+    _LOGGER.info("Synthesizing with %s (%s char(s))... ssml:%s", voice, len(text), ssml)
+    synthesis = _SharedSynthesis(
+        cache_key,
+        voice,
+        use_cache,
+        _synthesize_wavs(
+            text=text,
+            voice=voice,
+            lang=lang,
+            ssml=ssml,
+            ssml_args=ssml_args,
+            use_cache=use_cache,
+            **say_args,
+        ),
+    )
+    _INFLIGHT[(cache_key, use_cache)] = synthesis
+    return synthesis
+
+
+async def _join_fragments(wavs: typing.List[PCM_AND_SAMPLE_RATE]) -> bytes:
+    """Join synthesized fragments into a single WAV"""
+    # Final output WAV will use the maximum sample rate
+    sample_rates = set(sample_rate for (_samples, sample_rate) in wavs)
+    final_sample_rate = max(sample_rates)
+
+    # Copy audio from each synthesized fragment to the final output.
+    # Usually all rates match and the arrays are used as they are.
+    pcm_chunks = [
+        await fragment_to_pcm(fragment, final_sample_rate) for fragment in wavs
+    ]
+    return join_wav(pcm_chunks, final_sample_rate)
+
+
+def _synthesize_wavs(
+    text: str,
+    voice: str,
+    lang: str,
+    ssml: bool = False,
+    ssml_args: typing.Optional[typing.Dict[str, typing.Any]] = None,
+    **say_args,
+) -> typing.AsyncGenerator[PCM_AND_SAMPLE_RATE, None]:
     if ssml:
-        wavs_gen = ssml_to_wavs(
+        return ssml_to_wavs(
             ssml_text=text,
             default_voice=voice,
             default_lang=lang,
             ssml_args=ssml_args,
-            # Larynx settings
-            vocoder=vocoder,
-            denoiser_strength=denoiser_strength,
-            noise_scale=noise_scale,
-            length_scale=length_scale,
-        )
-    else:
-        wavs_gen = text_to_wavs(
-            text=text,
-            voice=voice,
-            # Larynx settings
-            vocoder=vocoder,
-            denoiser_strength=denoiser_strength,
-            noise_scale=noise_scale,
-            length_scale=length_scale,
+            **say_args,
         )
 
-    wavs = [result async for result in wavs_gen]
-    assert wavs, "No audio returned from synthesis"
+    return text_to_wavs(text=text, voice=voice, **say_args)
 
-    # Final output WAV will use the maximum sample rate
-    sample_rates = set(sample_rate for (_wav, sample_rate) in wavs)
-    final_sample_rate = max(sample_rates)
-    final_sample_width = 2  # bytes (16-bit)
-    final_n_channels = 1  # mono
-
-    with io.BytesIO() as final_wav_io:
-        final_wav_file: wave.Wave_write = wave.open(final_wav_io, "wb")
-        with final_wav_file:
-            final_wav_file.setframerate(final_sample_rate)
-            final_wav_file.setsampwidth(final_sample_width)
-            final_wav_file.setnchannels(final_n_channels)
-
-            # Copy audio from each syntheiszed WAV to the final output.
-            # If rate/width/channels do not match, resample with sox.
-            for synth_wav_bytes, _synth_sample_rate in wavs:
-                with io.BytesIO(synth_wav_bytes) as synth_wav_io:
-                    synth_wav_file: wave.Wave_read = wave.open(synth_wav_io, "rb")
-
-                    # Check settings
-                    if (
-                        (synth_wav_file.getframerate() != final_sample_rate)
-                        or (synth_wav_file.getsampwidth() != final_sample_width)
-                        or (synth_wav_file.getnchannels() != final_n_channels)
-                    ):
-                        # Upsample with sox
-                        sox_cmd = [
-                            "sox",
-                            "-t",
-                            "wav",
-                            "-",
-                            "-t",
-                            "raw",
-                            "-r",
-                            str(final_sample_rate),
-                            "-b",
-                            str(final_sample_width * 8),  # bits
-                            "-c",
-                            str(final_n_channels),
-                            "-",
-                        ]
-                        _LOGGER.debug(sox_cmd)
-                        proc = await asyncio.create_subprocess_exec(
-                            *sox_cmd,
-                            stdin=asyncio.subprocess.PIPE,
-                            stdout=asyncio.subprocess.PIPE,
-                        )
-                        resampled_raw_bytes, _ = await proc.communicate(
-                            input=synth_wav_bytes
-                        )
-                        final_wav_file.writeframes(resampled_raw_bytes)
-                    else:
-                        # Settings match, can write frames directly
-                        final_wav_file.writeframes(
-                            synth_wav_file.readframes(synth_wav_file.getnframes())
-                        )
-
-        final_wav_bytes = final_wav_io.getvalue()
 
-    end_time = time.time()
-    _LOGGER.debug(
-        "Synthesized %s byte(s) in %s second(s)",
-        len(final_wav_bytes),
-        end_time - start_time,
+async def fragment_to_pcm(
+    fragment: PCM_AND_SAMPLE_RATE, sample_rate: int
+) -> np.ndarray:
+    """Get the samples of a synthesized fragment at sample_rate"""
+    samples, fragment_sample_rate = fragment
+    if fragment_sample_rate != sample_rate:
+        return await resample(samples, fragment_sample_rate, sample_rate)
+
+    return samples
+
+
+def join_wav(pcm_chunks: typing.List[np.ndarray], sample_rate: int) -> bytes:
+    """Join 16-bit mono PCM chunks into a single WAV"""
+    # Header and audio are joined in a single allocation, straight from the
+    # array buffers
+    data_size = sum(pcm_chunk.nbytes for pcm_chunk in pcm_chunks)
+    return b"".join(
+        [
+            make_wav_header(data_size, sample_rate, _SAMPLE_WIDTH, _N_CHANNELS),
+            *pcm_chunks,
+        ]
     )
 
-    if final_wav_bytes and (cache_path is not None):
-        try:
-            _LOGGER.debug("Writing to cache: %s", cache_path)
-            cache_path.write_bytes(final_wav_bytes)
-        except Exception:
-            # Continue if a cache write fails
-            _LOGGER.exception("cache save")
 
-    return final_wav_bytes
+def make_wav_header(
+    data_size: int, sample_rate: int, sample_width: int, num_channels: int
+) -> bytes:
+    """Create the 44-byte RIFF header of a PCM WAV file"""
+    block_align = sample_width * num_channels
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF",
+        36 + data_size,
+        b"WAVE",
+        b"fmt ",
+        16,  # fmt chunk size
+        1,  # PCM
+        num_channels,
+        sample_rate,
+        sample_rate * block_align,  # byte rate
+        block_align,
+        sample_width * 8,  # bits per sample
+        b"data",
+        data_size,
+    )
+
+
+async def resample(
+    samples: np.ndarray, sample_rate: int, target_sample_rate: int
+) -> np.ndarray:
+    """Resample 16-bit mono PCM to target_sample_rate off the event loop"""
+    if (soxr is None) and (_signal is None):
+        wav_bytes = b"".join(
+            [
+                make_wav_header(samples.nbytes, sample_rate, _SAMPLE_WIDTH, _N_CHANNELS),
+                samples,
+            ]
+        )
+        resampled_raw_bytes = await _sox_resample(wav_bytes, target_sample_rate)
+        return np.frombuffer(resampled_raw_bytes, dtype=np.int16)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None,
+        functools.partial(resample_pcm, samples, sample_rate, target_sample_rate),
+    )
+
+
+def resample_pcm(
+    samples: np.ndarray, sample_rate: int, target_sample_rate: int
+) -> np.ndarray:
+    """Resample 16-bit mono PCM to target_sample_rate with soxr or scipy"""
+    if soxr is not None:
+        # soxr works on int16 directly
+        return soxr.resample(samples, sample_rate, target_sample_rate, quality="HQ")
+
+    factor = math.gcd(sample_rate, target_sample_rate)
+    audio = _signal.resample_poly(
+        samples.astype(np.float32),
+        target_sample_rate // factor,
+        sample_rate // factor,
+    )
+    return np.clip(audio, -32768, 32767).astype(np.int16)
+
+
+async def _sox_resample(wav_bytes: bytes, sample_rate: int) -> bytes:
+    """Resample WAV to raw 16-bit mono PCM with an external sox process"""
+    sox_cmd = [
+        "sox",
+        "-t",
+        "wav",
+        "-",
+        "-t",
+        "raw",
+        "-r",
+        str(sample_rate),
+        "-b",
+        "16",  # bits
+        "-c",
+        "1",  # mono
+        "-",
+    ]
+    _LOGGER.debug(sox_cmd)
+    proc = await asyncio.create_subprocess_exec(
+        *sox_cmd,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+    )
+    resampled_raw_bytes, _ = await proc.communicate(input=wav_bytes)
+    return resampled_raw_bytes
 
 
 async def text_to_wavs(
     text: str, voice: str, **say_args
-) -> typing.AsyncIterable[WAV_AND_SAMPLE_RATE]:
-    voice = TTSBase.resolve_voice(voice)
+) -> typing.AsyncGenerator[PCM_AND_SAMPLE_RATE, None]:
+    voice = await TTSBase.resolve_voice_async(voice)
 
-    assert ":" in voice, f"Invalid voice: {voice}"
-    tts_name, voice_id = voice.split(":", maxsplit=1)
-    tts = TTSBase.get(tts_name)
+    tts_name, sep, voice_id = voice.partition(":")
+    assert sep, f"Invalid voice: {voice}"
+    tts = await TTSBase.get_async(tts_name)
     assert tts, f"No TTS named {tts_name}"
 
-    if "#" in voice_id:
-        voice_id, speaker_id = voice_id.split("#", maxsplit=1)
+    voice_id, sep, speaker_id = voice_id.partition("#")
+    if sep:
         say_args["speaker_id"] = speaker_id
 
     # Process by line with single TTS
-    for line_index, line in enumerate(text.strip().splitlines()):
-        line = line.strip()
-        if not line:
-            continue
-
-        _LOGGER.debug("Synthesizing line %s: %s", line_index + 1, line)
-        line_wav_bytes = await tts.say(line, voice_id, **say_args)
-
-        assert line_wav_bytes, f"No WAV audio from line: {line_index+1}"
-        _LOGGER.debug(
-            "Got %s WAV byte(s) for line %s", len(line_wav_bytes), line_index + 1,
-        )
+    lines = []
+    for line_index, line_match in enumerate(_LINE_RE.finditer(text)):
+        line = line_match.group().strip()
+        if line:
+            lines.append((line_index, line))
+
+    # Lines are synthesized concurrently when the TTS allows it, but are
+    # still yielded in order.
+    semaphore = asyncio.Semaphore(_LINE_CONCURRENCY if tts.thread_safe else 1)
+
+    async def say_line(line_index: int, line: str) -> PCM_AND_SAMPLE_RATE:
+        async with semaphore:
+            _LOGGER.debug("Synthesizing line %s: %s", line_index + 1, line)
+            return await tts.say(line, voice_id, **say_args)
+
+    tasks = [asyncio.create_task(say_line(line_index, line)) for line_index, line in lines]
+    try:
+        for (line_index, _line), task in zip(lines, tasks):
+            line_samples, sample_rate = await task
+
+            assert line_samples.size, f"No audio from line: {line_index+1}"
+            _LOGGER.debug(
+                "Got %s sample(s) for line %s", line_samples.size, line_index + 1,
+            )
 
-        with io.BytesIO(line_wav_bytes) as line_wav_io:
-            line_wav_file: wave.Wave_read = wave.open(line_wav_io, "rb")
-            with line_wav_file:
-                yield (line_wav_bytes, line_wav_file.getframerate())
+            yield (line_samples, sample_rate)
+    finally:
+        # Stop remaining lines on error or when the consumer stops early
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 
 async def ssml_to_wavs(
@@ -238,7 +835,7 @@ async def ssml_to_wavs(
     default_voice: str,
     ssml_args: typing.Optional[typing.Dict[str, typing.Any]] = None,
     **say_args,
-) -> typing.AsyncIterable[WAV_AND_SAMPLE_RATE]:
+) -> typing.AsyncGenerator[PCM_AND_SAMPLE_RATE, None]:
     if ssml_args is None:
         ssml_args = {}
 
@@ -263,12 +860,11 @@ async def ssml_to_wavs(
             sent_voice = sentence.voice
         elif sentence.lang: # and (sentence.lang != default_lang):
             if default_voice:
-                voice = default_voice
-                if "#" in voice:
-                    voice, _ = default_voice.split("#", maxsplit=1)
-                if ":" in voice:
-                    _, lang = voice.split(":", maxsplit=1)
-                lang = re.split(r"[-_]", lang, maxsplit=1)[0]
+                voice = default_voice.partition("#")[0]
+                _tts_name, sep, voice_id = voice.partition(":")
+                if sep:
+                    lang = voice_id
+                lang = _LANG_SPLIT_RE.split(lang, maxsplit=1)[0]
                 if lang == sentence.lang:
                     sent_voice = default_voice
             if not sent_voice:
@@ -276,15 +872,15 @@ async def ssml_to_wavs(
         else:
             sent_voice = default_voice
 
-        sent_voice = TTSBase.resolve_voice(sent_voice)
+        sent_voice = await TTSBase.resolve_voice_async(sent_voice)
 
-        assert ":" in sent_voice, f"Invalid voice format: {sent_voice}"
-        tts_name, voice_id = sent_voice.split(":")
-        tts = TTSBase.get(tts_name)
+        tts_name, sep, voice_id = sent_voice.partition(":")
+        assert sep, f"Invalid voice format: {sent_voice}"
+        tts = await TTSBase.get_async(tts_name)
         assert tts, f"No TTS named {tts_name}"
 
-        if "#" in voice_id:
-            voice_id, speaker_id = voice_id.split("#", maxsplit=1)
+        voice_id, sep, speaker_id = voice_id.partition("#")
+        if sep:
             say_args["speaker_id"] = speaker_id
         else:
             # Need to remove speaker id for single speaker voices
@@ -297,67 +893,43 @@ async def ssml_to_wavs(
             sent_text.strip(),
         )
 
-        sent_wav_bytes = await tts.say(sent_text, voice_id, **say_args)
-        assert sent_wav_bytes, f"No WAV audio from sentence: {sent_text}"
+        sent_samples, sample_rate = await tts.say(sent_text, voice_id, **say_args)
+        assert sent_samples.size, f"No audio from sentence: {sent_text}"
         _LOGGER.debug(
-            "Got %s WAV byte(s) for line %s", len(sent_wav_bytes), sent_index + 1,
+            "Got %s sample(s) for line %s", sent_samples.size, sent_index + 1,
         )
 
-        # Add WAV bytes and sample rate to list.
-        # We will resample everything and append audio at the end.
-        with io.BytesIO(sent_wav_bytes) as sent_wav_io:
-            sent_wav_file: wave.Wave_read = wave.open(sent_wav_io, "rb")
-            with sent_wav_file:
-                sample_rate = sent_wav_file.getframerate()
-                sample_width = sent_wav_file.getsampwidth()
-                n_channels = sent_wav_file.getnchannels()
-
-                # Add pauses from SSML <break> tags
-                pause_before_ms = sentence.pause_before_ms
-                if sentence.words:
-                    # Add pause from first word
-                    pause_before_ms += sentence.words[0].pause_before_ms
-
-                if pause_before_ms > 0:
-                    pause_before_sec = pause_before_ms / 1000
-                    yield (
-                        make_silence_wav(
-                            pause_before_sec, sample_rate, sample_width, n_channels,
-                        ),
-                        sample_rate,
-                    )
+        # Yield samples and sample rate.
+        # Everything is resampled to the output rate when appended.
 
-                yield (sent_wav_bytes, sample_rate)
+        # Add pauses from SSML <break> tags
+        pause_before_ms = sentence.pause_before_ms
+        if sentence.words:
+            # Add pause from first word
+            pause_before_ms += sentence.words[0].pause_before_ms
 
-                pause_after_ms = sentence.pause_after_ms
-                if sentence.words:
-                    # Add pause from last word
-                    pause_after_ms += sentence.words[-1].pause_after_ms
+        if pause_before_ms > 0:
+            pause_before_sec = pause_before_ms / 1000
+            yield (
+                silence_pcm(pause_before_sec, sample_rate),
+                sample_rate,
+            )
 
-                if pause_after_ms > 0:
-                    pause_after_sec = pause_after_ms / 1000
-                    yield (
-                        make_silence_wav(
-                            pause_after_sec, sample_rate, sample_width, n_channels,
-                        ),
-                        sample_rate,
-                    )
+        yield (sent_samples, sample_rate)
 
+        pause_after_ms = sentence.pause_after_ms
+        if sentence.words:
+            # Add pause from last word
+            pause_after_ms += sentence.words[-1].pause_after_ms
 
-def make_silence_wav(
-    seconds: float, sample_rate: int, sample_width: int, num_channels: int
-) -> bytes:
-    """Create a WAV file with silence"""
-    with io.BytesIO() as wav_io:
-        wav_file: wave.Wave_write = wave.open(wav_io, "wb")
-        with wav_file:
-            wav_file.setframerate(sample_rate)
-            wav_file.setsampwidth(sample_width)
-            wav_file.setnchannels(num_channels)
-
-            num_zeros = int(
-                math.ceil(seconds * sample_rate * sample_width * num_channels)
+        if pause_after_ms > 0:
+            pause_after_sec = pause_after_ms / 1000
+            yield (
+                silence_pcm(pause_after_sec, sample_rate),
+                sample_rate,
             )
-            wav_file.writeframes(bytes(num_zeros))
 
-        return wav_io.getvalue()
+
+def silence_pcm(seconds: float, sample_rate: int) -> np.ndarray:
+    """Create 16-bit mono PCM audio with silence"""
+    return np.zeros(int(seconds * sample_rate), dtype=np.int16)
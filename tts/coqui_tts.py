@@ -1,24 +1,48 @@
 import asyncio
+import concurrent.futures
 import functools
-import io
 import json
 import re
 import typing
 from pathlib import Path
 
-from .tts_base import TTSBase, Voice, VoicesIterable
+import numpy as np
+
+from .tts_base import PCM_AND_SAMPLE_RATE, TTSBase, Voice, VoicesIterable
 from ..logger import LOGGER
 
+# Runs of sentence punctuation in Chinese text
+_ZH_PUNCT_RE = re.compile(r'([.!?。！？．])+')
+_ZH_FULL_STOPS = frozenset({"。", "？", "！"})
+_FULL_STOPS = frozenset({".", "?", "!"})
+
+def _zh_punct_replacer(m: re.Match) -> str:
+    """Replace a punctuation run with a single full-width punctuation"""
+    char = m.group(1)
+    if char == '.'  or char == '．':
+        char = '。'
+    elif ord(char) < 255 :
+        char = chr(ord(m.group(1))+0xfee0)
+    return char
+
 class CoquiTTS(TTSBase):
     """Wraps Coqui TTS (https://github.com/coqui-ai/TTS)"""
 
     name: str = "tts"
 
-    def __init__(self, models_dir: typing.Union[str, Path]):
+    def __init__(self, models_dir: typing.Union[str, Path], max_concurrency: int = 1):
+        super().__init__(max_concurrency=max_concurrency)
+
         self.models_dir = Path(models_dir)
 
         self.synthesizers: typing.Dict[str, typing.Any] = {}
 
+        # Models are loaded and run on their own threads (one per allowed
+        # synthesis) so long inferences don't starve the default executor
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="coqui"
+        )
+
         # Run text to speech
         from TTS.utils.synthesizer import Synthesizer
         self.Synthesizer = Synthesizer
@@ -78,24 +102,45 @@ class CoquiTTS(TTSBase):
             self.synthesizers[id] = synthesizer
         return synthesizer
 
+    async def warmup(self):
+        """Load the synthesizers of all installed voices."""
+        loop = asyncio.get_running_loop()
+        for voice in self.tts_voices.values():
+            if (self.models_dir / voice.id).exists():
+                LOGGER.debug("Loading Coqui-TTS voice %s", voice.id)
+                await loop.run_in_executor(self._executor, self.getSynthesizer, voice.id)
+
     async def _voices(self) -> VoicesIterable:
         """Get list of available voices."""
-        for voice in self.tts_voices.values():
-            model_path = self.models_dir / voice.id # type: ignore
-            if model_path.exists():
-                if voice.multispeaker and (voice.speakers is None):
-                    # Load speaker ids
-                    speaker_ids_path = model_path / "speaker_ids.json"
-                    if speaker_ids_path.is_file():
-                        with open(
-                            speaker_ids_path, "r", encoding="utf-8"
-                        ) as speaker_ids_file:
-                            voice.speakers = json.load(speaker_ids_file)
+        voices = list(self.tts_voices.values())
 
+        # Check models and read speaker ids of all voices concurrently
+        installed = await asyncio.gather(
+            *(asyncio.to_thread(self._load_voice_info, voice) for voice in voices)
+        )
+        for voice, is_installed in zip(voices, installed):
+            if is_installed:
                 yield voice
 
-    async def say(self, text: str, voice_id: str, **kwargs) -> bytes:
-        """Speak text as WAV."""
+    def _load_voice_info(self, voice: Voice) -> bool:
+        """Load speaker ids of an installed voice, False if not installed"""
+        model_path = self.models_dir / voice.id # type: ignore
+        if not model_path.exists():
+            return False
+
+        if voice.multispeaker and (voice.speakers is None):
+            # Load speaker ids
+            speaker_ids_path = model_path / "speaker_ids.json"
+            if speaker_ids_path.is_file():
+                with open(
+                    speaker_ids_path, "r", encoding="utf-8"
+                ) as speaker_ids_file:
+                    voice.speakers = json.load(speaker_ids_file)
+
+        return True
+
+    async def _say(self, text: str, voice_id: str, **kwargs) -> PCM_AND_SAMPLE_RATE:
+        """Speak text as 16-bit mono PCM."""
         speaker_id = kwargs.get("speaker_id")
 
         voice = self.tts_voices.get(voice_id)
@@ -111,7 +156,12 @@ class CoquiTTS(TTSBase):
                 # First speaker id
                 speaker_id = 0
 
-        synthesizer = self.getSynthesizer(voice.id)
+        loop = asyncio.get_running_loop()
+
+        # Load the model (if warmup didn't) off the event loop
+        synthesizer = await loop.run_in_executor(
+            self._executor, self.getSynthesizer, voice.id
+        )
 
         assert synthesizer is not None
 
@@ -119,32 +169,38 @@ class CoquiTTS(TTSBase):
         text = text.strip()
         if text:
             if voice.id == "zh_baker":
-                def mReplacer(m):
-                    char = m.group(1)
-                    if char == '.'  or char == '．':
-                        char = '。'
-                    elif ord(char) < 255 :
-                        char = chr(ord(m.group(1))+0xfee0)
-                    return char
                 # merge multi punctuation into one punctuation
-                text = re.sub(r'([.!?。！？．])+', mReplacer, text)
-                if (text[-1] not in {"。", "？", "！"}):
+                text = _ZH_PUNCT_RE.sub(_zh_punct_replacer, text)
+                if (text[-1] not in _ZH_FULL_STOPS):
                     text = text + "。"
-            elif (text[-1] not in {".", "?", "!"}):
+            elif (text[-1] not in _FULL_STOPS):
                 text = text + "."
 
         LOGGER.debug("Prepared Say: %s", text)
 
         # Run asynchronously in executor
-        loop = asyncio.get_running_loop()
-        audio = await loop.run_in_executor(
-            None,
+        samples = await loop.run_in_executor(
+            self._executor,
             functools.partial(
-                synthesizer.tts, text, speaker_name=speaker_id,  # type: ignore
+                _synthesize_pcm, synthesizer, text, speaker_id,
             ),
         )
 
-        with io.BytesIO() as wav_io:
-            synthesizer.save_wav(audio, wav_io)  # type: ignore
+        return (samples, synthesizer.output_sample_rate)
+
+def _synthesize_pcm(
+    synthesizer: typing.Any, text: str, speaker_id: typing.Any
+) -> np.ndarray:
+    """Run synthesis and convert the float audio to 16-bit PCM"""
+    import torch
+
+    # No autograd bookkeeping during inference
+    inference_mode = getattr(torch, "inference_mode", torch.no_grad)
+    with inference_mode():
+        wav = synthesizer.tts(text, speaker_name=speaker_id)
+
+    audio = np.asarray(wav, dtype=np.float32)
 
-            return wav_io.getvalue()
+    # Peak normalization, as done by synthesizer.save_wav
+    audio *= 32767 / max(0.01, float(np.max(np.abs(audio))))
+    return audio.astype(np.int16)
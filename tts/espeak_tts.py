@@ -1,20 +1,183 @@
 import asyncio
+import ctypes
+import ctypes.util
+import functools
 import shutil
 import shlex
+import threading
+import typing
 
-from .tts_base import TTSBase, Voice, VoicesIterable
+import numpy as np
+
+from .tts_base import (
+    PCM_AND_SAMPLE_RATE,
+    TTSBase,
+    Voice,
+    VoicesIterable,
+    parse_wav_header,
+)
 from ..logger import LOGGER as _LOGGER
 
+# int (*t_espeak_callback)(short* wav, int numsamples, espeak_EVENT* events)
+_SYNTH_CALLBACK = ctypes.CFUNCTYPE(
+    ctypes.c_int, ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p
+)
+
+class _EspeakVoice(ctypes.Structure):
+    """espeak_VOICE voice selector"""
+
+    _fields_ = [
+        ("name", ctypes.c_char_p),
+        ("languages", ctypes.c_char_p),
+        ("identifier", ctypes.c_char_p),
+        ("gender", ctypes.c_ubyte),
+        ("age", ctypes.c_ubyte),
+        ("variant", ctypes.c_ubyte),
+        ("xx1", ctypes.c_ubyte),
+        ("score", ctypes.c_int),
+        ("spare", ctypes.c_void_p),
+    ]
+
+class LibEspeak:
+    """Synchronous ctypes binding of libespeak-ng (16-bit mono PCM output).
+
+    libespeak-ng state is process-global, use _get_libespeak() for the
+    shared instance.
+    """
+
+    AUDIO_OUTPUT_SYNCHRONOUS = 0x02
+    INITIALIZE_DONT_EXIT = 0x8000
+    POS_CHARACTER = 1
+    CHARS_UTF8 = 1
+    EE_OK = 0
+    PCM_BUFFER_SIZE = 256 * 1024
+
+    def __init__(self, lib_path: typing.Optional[str] = None):
+        if not lib_path:
+            lib_path = ctypes.util.find_library("espeak-ng") or "libespeak-ng.so.1"
+
+        lib = ctypes.CDLL(lib_path)
+        lib.espeak_Initialize.argtypes = [
+            ctypes.c_int, ctypes.c_int, ctypes.c_char_p, ctypes.c_int,
+        ]
+        lib.espeak_SetSynthCallback.argtypes = [_SYNTH_CALLBACK]
+        lib.espeak_SetVoiceByName.argtypes = [ctypes.c_char_p]
+        lib.espeak_SetVoiceByProperties.argtypes = [ctypes.POINTER(_EspeakVoice)]
+        lib.espeak_Synth.argtypes = [
+            ctypes.c_void_p,  # text
+            ctypes.c_size_t,  # size
+            ctypes.c_uint,  # position
+            ctypes.c_int,  # position_type
+            ctypes.c_uint,  # end_position
+            ctypes.c_uint,  # flags
+            ctypes.c_void_p,  # unique_identifier
+            ctypes.c_void_p,  # user_data
+        ]
+
+        # Data path comes from ESPEAK_DATA_PATH or the compiled-in default
+        self.sample_rate = lib.espeak_Initialize(
+            self.AUDIO_OUTPUT_SYNCHRONOUS, 0, None, self.INITIALIZE_DONT_EXIT
+        )
+        if self.sample_rate <= 0:
+            raise OSError(f"Failed to initialize {lib_path}")
+
+        self.lib = lib
+        # Serializes syntheses, which share the voice and callback
+        self.lock = threading.Lock()
+        # Reused for all syntheses (which are serialized), grown as needed
+        self._pcm_buffer = bytearray(self.PCM_BUFFER_SIZE)
+        self._pcm_size = 0
+        # Keep a reference so the callback isn't garbage collected
+        self._callback = _SYNTH_CALLBACK(self._on_synth)
+        lib.espeak_SetSynthCallback(self._callback)
+
+    def _on_synth(self, wav, num_samples, _events) -> int:
+        if wav and (num_samples > 0):
+            num_bytes = num_samples * 2
+            pcm_end = self._pcm_size + num_bytes
+            if pcm_end > len(self._pcm_buffer):
+                self._pcm_buffer.extend(
+                    bytes(max(pcm_end, 2 * len(self._pcm_buffer)) - len(self._pcm_buffer))
+                )
+
+            # Copy straight from espeak's buffer
+            self._pcm_buffer[self._pcm_size : pcm_end] = (
+                ctypes.c_char * num_bytes
+            ).from_address(wav)
+            self._pcm_size = pcm_end
+
+        # Continue synthesis
+        return 0
+
+    def synth(self, text: str, voice_name: str) -> np.ndarray:
+        """Speak text as 16-bit PCM, one call at a time."""
+        with self.lock:
+            return self._synth(text, voice_name)
+
+    def _synth(self, text: str, voice_name: str) -> np.ndarray:
+        # Same lookup as "espeak-ng -v": by name, then by language
+        if self.lib.espeak_SetVoiceByName(voice_name.encode()) != self.EE_OK:
+            voice_select = _EspeakVoice(languages=voice_name.encode())
+            if self.lib.espeak_SetVoiceByProperties(voice_select) != self.EE_OK:
+                raise ValueError(f"No espeak voice {voice_name}")
+
+        text_bytes = text.encode("utf-8") + b"\0"
+        self._pcm_size = 0
+        result = self.lib.espeak_Synth(
+            text_bytes,
+            len(text_bytes),
+            0,
+            self.POS_CHARACTER,
+            0,
+            self.CHARS_UTF8,
+            None,
+            None,
+        )
+        if result != self.EE_OK:
+            raise OSError(f"espeak_Synth failed: {result}")
+
+        # Copy out of the reused buffer
+        return np.frombuffer(
+            self._pcm_buffer, dtype=np.int16, count=self._pcm_size // 2
+        ).copy()
+
+# Loaded once per process and shared by all EspeakTTS instances
+_LIBESPEAK: typing.Optional[LibEspeak] = None
+_LIBESPEAK_LOCK = threading.Lock()
+
+def _get_libespeak(lib_path: typing.Optional[str] = None) -> LibEspeak:
+    """Get the shared libespeak-ng binding, loading it on first use"""
+    global _LIBESPEAK
+    with _LIBESPEAK_LOCK:
+        if _LIBESPEAK is None:
+            _LIBESPEAK = LibEspeak(lib_path)
+        return _LIBESPEAK
+
 class EspeakTTS(TTSBase):
     """Wraps eSpeak (http://espeak.sourceforge.net)"""
 
     name: str = "espeak"
+    # Each subprocess is independent, libespeak-ng calls are serialized
+    thread_safe: bool = True
+
+    def __init__(
+        self,
+        lib_path: typing.Optional[str] = None,
+        max_concurrency: typing.Optional[int] = None,
+    ):
+        super().__init__(max_concurrency=max_concurrency)
 
-    def __init__(self):
         self.espeak_prog = "espeak-ng"
         if not shutil.which(self.espeak_prog):
             self.espeak_prog = "espeak"
 
+        # Synthesize in-process when libespeak-ng is available
+        self.libespeak: typing.Optional[LibEspeak] = None
+        try:
+            self.libespeak = _get_libespeak(lib_path)
+        except Exception as err:
+            _LOGGER.debug("libespeak-ng not available, using %s: %s", self.espeak_prog, err)
+
     async def _voices(self) -> VoicesIterable:
         """Get list of available voices."""
         espeak_cmd = [self.espeak_prog, "--voices"]
@@ -34,7 +197,7 @@ class EspeakTTS(TTSBase):
 
             parts = line.split()
             locale = parts[1]
-            language = locale.split("-", maxsplit=1)[0]
+            language = locale.partition("-")[0]
             if locale == "cmn":
                 locale = "zh-cmn"
                 language = "zh"
@@ -50,8 +213,11 @@ class EspeakTTS(TTSBase):
                 language=language,
             )
 
-    async def say(self, text: str, voice_id: str, **kwargs) -> bytes:
-        """Speak text as WAV."""
+    async def _say(self, text: str, voice_id: str, **kwargs) -> PCM_AND_SAMPLE_RATE:
+        """Speak text as 16-bit mono PCM."""
+        if self.libespeak is not None:
+            return await self._lib_say(text, voice_id)
+
         espeak_cmd = [
             self.espeak_prog,
             "-v",
@@ -65,4 +231,30 @@ class EspeakTTS(TTSBase):
             *espeak_cmd, stdout=asyncio.subprocess.PIPE
         )
         stdout, _ = await proc.communicate()
-        return stdout
+
+        sample_rate, sample_width, num_channels, data_offset, data_size = (
+            parse_wav_header(stdout)
+        )
+        assert (sample_width == 2) and (
+            num_channels == 1
+        ), "Expected 16-bit mono WAV from espeak"
+
+        # Trim odd trailing byte of a truncated stream
+        data_size -= data_size % 2
+        return (
+            np.frombuffer(stdout, dtype=np.int16, count=data_size // 2, offset=data_offset),
+            sample_rate,
+        )
+
+    async def _lib_say(self, text: str, voice_id: str) -> PCM_AND_SAMPLE_RATE:
+        """Speak text as 16-bit mono PCM with libespeak-ng."""
+        libespeak = self.libespeak
+        assert libespeak is not None
+
+        # Serialized by the binding's lock, shared with other instances
+        loop = asyncio.get_running_loop()
+        samples = await loop.run_in_executor(
+            None, functools.partial(libespeak.synth, text, str(voice_id)),
+        )
+
+        return (samples, libespeak.sample_rate)
@@ -1,26 +1,50 @@
 """Text to speech wrappers for OpenTTS"""
 from __future__ import annotations
 import asyncio
+import concurrent.futures
 import functools
-import io
-import json
+import hashlib
 import logging
 import itertools
-import platform
+import queue
 import re
-import shlex
-import shutil
-import tempfile
+import struct
+import sys
+import threading
 import typing
-from collections import defaultdict
-from abc import ABCMeta
+from collections import OrderedDict
+from abc import ABCMeta, abstractmethod
 from dataclasses import dataclass
 from pathlib import Path
-from zipfile import ZipFile
+
+import numpy as np
 
 from ..logger import LOGGER
 
-_LOOP = asyncio.get_event_loop()
+_LANG_SPLIT_RE = re.compile(r"[-_]")
+
+def _alias_key(lang: str) -> str:
+    """Key of a language or locale in voice_aliases (en_US -> en-us)"""
+    return lang.lower().replace("_", "-")
+
+def _alias_keys(lang: str) -> typing.Tuple[str, ...]:
+    """Keys a voice of lang is found under: the locale and its language (en-US -> en)"""
+    lang = _alias_key(lang)
+    lang_prefix = _LANG_SPLIT_RE.split(lang, maxsplit=1)[0]
+    if lang_prefix != lang:
+        return (lang, lang_prefix)
+    return (lang,)
+
+def _voice_langs(voice: "Voice", full_id: str) -> typing.List[typing.Tuple[str, str]]:
+    """(lang, voice) pairs for the locale and language of a voice"""
+    return [(lang, full_id) for lang in (voice.locale, voice.language) if lang]
+
+# Told apart in the say cache, never reused unlike id()
+_SAY_CACHE_IDS = itertools.count()
+
+# Bumped on every change to voice aliases or TTS systems, so memoized voice
+# lookups of older versions are never hit again
+_VOICE_VERSION = 0
 
 # -----------------------------------------------------------------------------
 
@@ -40,32 +64,129 @@ class Voice:
 
 VoicesIterable = typing.AsyncGenerator[Voice, None]
 
+# 16-bit mono PCM samples (int16 array) and their sample rate
+PCM_AND_SAMPLE_RATE = typing.Tuple[np.ndarray, int]
+
+def parse_wav_header(wav_bytes: bytes) -> typing.Tuple[int, int, int, int, int]:
+    """Get (sample_rate, sample_width, num_channels, data_offset, data_size) of a WAV"""
+    riff, _riff_size, wave_id = struct.unpack_from("<4sI4s", wav_bytes, 0)
+    assert (riff == b"RIFF") and (wave_id == b"WAVE"), "Not a WAV file"
+
+    # Walk chunks up to "data" (just one step for canonical 44-byte headers)
+    sample_rate = sample_width = num_channels = 0
+    offset = 12
+    while offset + 8 <= len(wav_bytes):
+        chunk_id, chunk_size = struct.unpack_from("<4sI", wav_bytes, offset)
+        offset += 8
+        if chunk_id == b"fmt ":
+            (
+                _audio_format,
+                num_channels,
+                sample_rate,
+                _byte_rate,
+                _block_align,
+                bits_per_sample,
+            ) = struct.unpack_from("<HHIIHH", wav_bytes, offset)
+            sample_width = bits_per_sample // 8
+        elif chunk_id == b"data":
+            # Streamed WAVs (espeak --stdout) have a placeholder data size
+            data_size = min(chunk_size, len(wav_bytes) - offset)
+            return (sample_rate, sample_width, num_channels, offset, data_size)
+
+        # Chunks are padded to an even size
+        offset += chunk_size + (chunk_size & 1)
+
+    raise ValueError("No data chunk in WAV")
+
 class TTSException(Exception):
     pass
 
 class TTSRegisterException(Exception):
     pass
 
+class _Pending:
+    """Registered TTS system that is created on first use"""
+
+    __slots__ = ("tts_class", "kwargs", "probe", "lock")
+
+    def __init__(
+        self,
+        tts_class: typing.Type[TTSBase],
+        kwargs: typing.Dict[str, typing.Any],
+        probe: typing.Optional[concurrent.futures.Future] = None,
+    ):
+        self.tts_class = tts_class
+        self.kwargs = kwargs
+        # Resolves to whether the TTS system can be created
+        self.probe = probe
+        self.lock = threading.Lock()
+
 class TTSBase(metaclass=ABCMeta):
     """Base class of TTS systems."""
 
     # the allowed languages
     langs: typing.List[str] = []
     default_lang: str = 'en'
-    voice_aliases: typing.Dict[str, typing.List[typing.Any]] = defaultdict(list)
-    _TTSList: typing.Dict[str, TTSBase] = {}
+    # language -> voices in order of preference (dicts as ordered sets).
+    # Merged from the dicts below and replaced, never changed in place.
+    voice_aliases: typing.Dict[str, typing.Dict[str, None]] = {}
+    # language -> voices from add_preferred_voice, most recent first
+    _preferred_aliases: typing.Dict[str, typing.Dict[str, None]] = {}
+    # TTS name -> language -> voices, merged in registration order
+    _tts_aliases: typing.Dict[str, typing.Dict[str, typing.Dict[str, None]]] = {}
+    _aliases_lock = threading.RLock()
+    _TTSList: typing.Dict[str, typing.Union[TTSBase, _Pending]] = {}
+    # Names in _TTSList, updated by register/unregister
+    _TTSNames: typing.FrozenSet[str] = frozenset()
     # the TTS Engine Name
     name: str = ''
     # the models dir
     models_dir: typing.Optional[Path] = None
+    # whether say() may run concurrently
+    thread_safe: bool = False
+    # Recently spoken lines of all TTS systems, least recently used first
+    _say_cache: "OrderedDict[bytes, PCM_AND_SAMPLE_RATE]" = OrderedDict()
+    _say_cache_lock = threading.Lock()
+    _say_cache_bytes: int = 0
+    say_cache_max_entries: int = 256
+    say_cache_max_bytes: int = 32 * 1024 * 1024
+
+    def __init__(self, max_concurrency: typing.Optional[int] = 1):
+        # Syntheses beyond this wait instead of competing for CPU/GPU.
+        # None leaves the limit to the callers.
+        self._say_semaphore: typing.Optional[asyncio.Semaphore] = None
+        if max_concurrency is not None:
+            assert max_concurrency > 0, "max_concurrency must be positive"
+            self._say_semaphore = asyncio.Semaphore(max_concurrency)
+        # All voices from _voices(), enumerated once
+        self._voices_cached: typing.Optional[typing.List[Voice]] = None
+        # Instances of the same class don't share spoken lines
+        self._say_cache_id = next(_SAY_CACHE_IDS)
 
     @classmethod
     def get_preferred_voice(Cls, lang: str) -> str:
-        LOGGER.debug("voice_aliases: %s", str(Cls.voice_aliases))
+        return Cls._get_preferred_voice(lang, _VOICE_VERSION)
+
+    @classmethod
+    async def get_preferred_voice_async(Cls, lang: str) -> str:
+        """Like get_preferred_voice, but creates pending TTS systems off the loop"""
+        if TTSBase._has_pending():
+            await TTSBase._wait_for_probes()
+            return await asyncio.to_thread(Cls.get_preferred_voice, lang)
+        return Cls.get_preferred_voice(lang)
+
+    @classmethod
+    @functools.lru_cache(maxsize=256)
+    def _get_preferred_voice(Cls, lang: str, _version: int) -> str:
+        lang = _alias_key(lang)
+        Cls._create_pending_until((lang,))
+        if LOGGER.isEnabledFor(logging.DEBUG):
+            LOGGER.debug("voice_aliases: %s", str(Cls.voice_aliases))
         voices = Cls.voice_aliases.get(lang)
         result = ""
         if voices:
-            result = voices[0]
+            # Skip voices of TTS systems that turned out to be unavailable
+            result = _pick(voices, TTSBase._is_available) or ""
         return result
     @classmethod
     def create(Cls, **kwargs):
@@ -75,73 +196,343 @@ class TTSBase(metaclass=ABCMeta):
         return instance
 
     async def _init(self):
-        async for voice in self.voices():
-            self.add_voice_aliases(voice)
+        self.add_voice_aliases_many([voice async for voice in self.voices()])
 
+    @abstractmethod
     async def _voices(self) -> VoicesIterable:
         """Get list of available voices."""
-        yield Voice("", "", "", "", "")
+        # Keeps this an async generator
+        if False:  # pylint: disable=using-constant-test
+            yield
 
     async def voices(self) -> VoicesIterable:
         """Get list of allowed voices."""
-        voices = self._voices()
-        async for voice in voices:
-            if voice.language in TTSBase.langs:
+        if self._voices_cached is None:
+            self._voices_cached = [voice async for voice in self._voices()]
+
+        langs = frozenset(TTSBase.langs)
+        for voice in self._voices_cached:
+            if voice.language in langs:
                 yield voice
 
-    async def say(self, text: str, voice_id: str, **kwargs) -> bytes:
-        """Speak text as WAV."""
-        return bytes()
+    async def say(
+        self, text: str, voice_id: str, use_cache: bool = True, **kwargs
+    ) -> PCM_AND_SAMPLE_RATE:
+        """Speak text as 16-bit mono PCM, reusing recently spoken lines if use_cache."""
+        if (
+            (not use_cache)
+            or (TTSBase.say_cache_max_entries <= 0)
+            or (TTSBase.say_cache_max_bytes <= 0)
+        ):
+            return await self._say_limited(text, voice_id, **kwargs)
+
+        cache_key = hashlib.blake2b(
+            f"{self._say_cache_id}|{voice_id}|{text}|{sorted(kwargs.items())}".encode(),
+            digest_size=16,
+        ).digest()
+
+        _say_cache = TTSBase._say_cache
+        with TTSBase._say_cache_lock:
+            cached = _say_cache.get(cache_key)
+            if cached is not None:
+                _say_cache.move_to_end(cache_key)
+                return cached
+
+        samples, sample_rate = await self._say_limited(text, voice_id, **kwargs)
+
+        # Shared by every cache hit
+        samples.flags.writeable = False
+        with TTSBase._say_cache_lock:
+            replaced = _say_cache.pop(cache_key, None)
+            if replaced is not None:
+                TTSBase._say_cache_bytes -= replaced[0].nbytes
+            _say_cache[cache_key] = (samples, sample_rate)
+            TTSBase._say_cache_bytes += samples.nbytes
+            _trim_say_cache()
+
+        return (samples, sample_rate)
+
+    async def _say_limited(self, text: str, voice_id: str, **kwargs) -> PCM_AND_SAMPLE_RATE:
+        if self._say_semaphore is None:
+            return await self._say(text, voice_id, **kwargs)
+
+        async with self._say_semaphore:
+            return await self._say(text, voice_id, **kwargs)
+
+    async def _say(self, text: str, voice_id: str, **kwargs) -> PCM_AND_SAMPLE_RATE:
+        """Speak text as 16-bit mono PCM."""
+        return (np.zeros(0, dtype=np.int16), 0)
+
+    async def warmup(self):
+        """Load models ahead of the first say()."""
 
     @classmethod
     def add_voice_aliases(Cls, voice: typing.Union[str, Voice], lang: str = ''):
         if isinstance(voice, Voice):
+            full_id = Cls.name + ':' + voice.id
             if not lang:
-                lang = voice.language
-            voice = Cls.name + ':' + voice.id
+                # Under its locale and language
+                TTSBase._add_tts_aliases(Cls.name, _voice_langs(voice, full_id))
+                return
+            voice = full_id
 
         if lang and voice:
-            aliases = Cls.voice_aliases[lang]
-            if not aliases:
-                aliases = Cls.voice_aliases[lang] = []
-            if voice not in aliases:
-                # type: ignore
-                aliases.append(voice)
+            TTSBase._add_tts_aliases(voice.partition(":")[0], [(lang, voice)])
 
     @classmethod
-    def register(TTSClass: typing.Type[TTSBase], name: typing.Optional[str] = None, **kwargs):
+    def add_voice_aliases_many(Cls, voices: typing.Iterable[Voice]):
+        """Add each voice as an alias of its locale and language"""
+        TTSBase._add_tts_aliases(
+            Cls.name,
+            [
+                lang_voice
+                for voice in voices
+                if voice.id
+                for lang_voice in _voice_langs(voice, Cls.name + ':' + voice.id)
+            ],
+        )
+
+    @staticmethod
+    def _add_tts_aliases(
+        tts_name: str, lang_voices: typing.Iterable[typing.Tuple[str, str]]
+    ):
+        with TTSBase._aliases_lock:
+            tts_aliases = TTSBase._tts_aliases.setdefault(tts_name.lower(), {})
+            added = False
+            for lang, voice in lang_voices:
+                for alias_key in _alias_keys(lang):
+                    aliases = tts_aliases.setdefault(alias_key, {})
+                    if voice not in aliases:
+                        aliases[voice] = None
+                        added = True
+
+            if added:
+                TTSBase._update_voice_aliases()
+
+    @staticmethod
+    def add_preferred_voice(lang: str, voice: str):
+        """Make voice the first choice for lang (and its locales, for a language)"""
+        lang = _alias_key(lang)
+        with TTSBase._aliases_lock:
+            aliases = {voice: None}
+            aliases.update(TTSBase._preferred_aliases.get(lang, {}))
+            TTSBase._preferred_aliases[lang] = aliases
+            TTSBase._update_voice_aliases()
+
+    @staticmethod
+    def _update_voice_aliases():
+        """Rebuild voice_aliases so the order doesn't depend on creation order"""
+        with TTSBase._aliases_lock:
+            order = {name: index for index, name in enumerate(list(TTSBase._TTSList))}
+            tts_aliases = sorted(
+                TTSBase._tts_aliases.items(),
+                key=lambda item: order.get(item[0], len(order)),
+            )
+
+            merged: typing.Dict[str, typing.Dict[str, None]] = {}
+            for _tts_name, lang_voices in tts_aliases:
+                for lang, voices in lang_voices.items():
+                    merged.setdefault(lang, {}).update(voices)
+
+            # Preferred voices of a locale, then of its language, then the
+            # voices of TTS systems
+            preferred_aliases = TTSBase._preferred_aliases
+            voice_aliases: typing.Dict[str, typing.Dict[str, None]] = {}
+            for lang in itertools.chain(preferred_aliases, merged):
+                if lang in voice_aliases:
+                    continue
+
+                aliases: typing.Dict[str, None] = {}
+                for alias_key in _alias_keys(lang):
+                    aliases.update(preferred_aliases.get(alias_key, {}))
+                aliases.update(merged.get(lang, {}))
+                voice_aliases[lang] = aliases
+
+            # Readers on other threads keep iterating the previous dict
+            TTSBase.voice_aliases = voice_aliases
+
+        TTSBase.clear_voice_cache()
+
+    @classmethod
+    def register(
+        TTSClass: typing.Type[TTSBase],
+        name: typing.Optional[str] = None,
+        lazy: bool = False,
+        probe: typing.Optional[concurrent.futures.Future] = None,
+        **kwargs,
+    ) -> typing.Optional[TTSBase]:
+        """Register and create a TTS system, or create it on first get() if lazy.
+
+        If given, probe is awaited (without blocking the event loop in the
+        *_async lookups) before creating the TTS system, which is dropped if
+        the probe's result is false.
+        """
         _TTSList = TTSBase._TTSList
         if not name:
             name = TTSClass.name
-        name = name.lower()
-        obj = _TTSList.get(name)
-        if obj is None:
-            obj = TTSClass.create(**kwargs)
-            # await obj._init()
-            _TTSList[name] = obj
-        else:
+        # Interned so voice lookups compare names by identity first
+        name = sys.intern(name.lower())
+        if name in _TTSList:
             raise TTSRegisterException('already exists')
-        return obj
+
+        _TTSList[name] = _Pending(TTSClass, kwargs, probe=probe)
+        TTSBase._TTSNames = frozenset(_TTSList)
+        TTSBase._update_voice_aliases()
+        if lazy:
+            return None
+
+        # None if the probe failed
+        return TTSBase.get(name)
+
+    @staticmethod
+    def get(name: str) -> typing.Optional[TTSBase]:
+        name = name.lower()
+        obj = TTSBase._TTSList.get(name)
+        if isinstance(obj, _Pending):
+            obj = TTSBase._create_pending(name, obj)
+        return obj # type: ignore
 
     @staticmethod
-    def get(name: str) -> TTSBase:
-        return TTSBase._TTSList.get(name.lower()) # type: ignore
+    async def get_async(name: str) -> typing.Optional[TTSBase]:
+        """Like get, but creates a pending TTS system off the loop"""
+        obj = TTSBase._TTSList.get(name.lower())
+        if isinstance(obj, _Pending):
+            if (obj.probe is not None) and (not obj.probe.done()):
+                await asyncio.wrap_future(obj.probe)
+            return await asyncio.to_thread(TTSBase.get, name)
+        return obj # type: ignore
+
+    @staticmethod
+    def _has_pending() -> bool:
+        return any(isinstance(obj, _Pending) for obj in TTSBase._TTSList.values())
+
+    @staticmethod
+    async def _wait_for_probes():
+        """Await the probes of pending TTS systems instead of blocking a thread"""
+        probes = [
+            asyncio.wrap_future(obj.probe)
+            for obj in list(TTSBase._TTSList.values())
+            if isinstance(obj, _Pending) and (obj.probe is not None) and (not obj.probe.done())
+        ]
+        if probes:
+            await asyncio.gather(*probes)
+
+    @staticmethod
+    def _create_pending(name: str, pending: _Pending) -> typing.Optional[TTSBase]:
+        with pending.lock:
+            obj = TTSBase._TTSList.get(name)
+            if obj is pending:
+                if (pending.probe is not None) and (not pending.probe.result()):
+                    LOGGER.debug("TTS system %s is not available", name)
+                    TTSBase.unregister(name)
+                    return None
+
+                LOGGER.debug("Loading TTS system %s", name)
+                obj = pending.tts_class.create(**pending.kwargs)
+                TTSBase._TTSList[name] = obj
+                TTSBase.clear_voice_cache()
+
+        return obj # type: ignore
+
+    @staticmethod
+    def _create_pending_until(alias_keys: typing.Sequence[str]):
+        """Create pending TTS systems in registration order until one has aliases"""
+        # The voices (and aliases) of a pending TTS system are unknown, and
+        # an earlier registered TTS system comes first. Preferred voices don't
+        # count, their TTS system may turn out to be unavailable.
+        for name in list(TTSBase._TTSList):
+            if TTSBase.get(name) is None:
+                continue
+
+            tts_aliases = TTSBase._tts_aliases.get(name, {})
+            if any(tts_aliases.get(key) for key in alias_keys):
+                break
+
+    @staticmethod
+    def _is_available(name: str) -> bool:
+        """Whether a TTS system is registered and created, creating it if pending"""
+        if name not in TTSBase._TTSNames:
+            return False
+        return TTSBase.get(name) is not None
+
+    @staticmethod
+    def items() -> typing.List[typing.Tuple[str, TTSBase]]:
+        """Get all registered TTS systems by name, creating pending ones"""
+        tts_items = []
+        for name in list(TTSBase._TTSList):
+            tts = TTSBase.get(name)
+            if tts is not None:
+                tts_items.append((name, tts))
+
+        return tts_items
+
+    @staticmethod
+    async def items_async() -> typing.List[typing.Tuple[str, TTSBase]]:
+        """Like items, but creates pending TTS systems off the loop"""
+        if TTSBase._has_pending():
+            await TTSBase._wait_for_probes()
+            return await asyncio.to_thread(TTSBase.items)
+        return TTSBase.items()
+
+    @staticmethod
+    def prefetch() -> threading.Thread:
+        """Create registered TTS systems and load their models in the background"""
+
+        def run():
+            for name in list(TTSBase._TTSList):
+                try:
+                    tts = TTSBase.get(name)
+                    if tts is not None:
+                        async_run_and_get(tts.warmup())
+                except Exception:
+                    LOGGER.exception("prefetch %s", name)
+
+        thread = threading.Thread(target=run, name="tts_prefetch", daemon=True)
+        thread.start()
+        return thread
 
     @staticmethod
     def unregister(name: str) -> typing.Optional[TTSBase]:
-        return TTSBase._TTSList.pop(name, None)
+        obj = TTSBase._TTSList.pop(name, None)
+        TTSBase._TTSNames = frozenset(TTSBase._TTSList)
+        TTSBase._update_voice_aliases()
+        if isinstance(obj, _Pending):
+            # Never created
+            return None
+        return obj
+
+    @staticmethod
+    def clear_voice_cache():
+        """Forget memoized voice lookups"""
+        global _VOICE_VERSION
+        _VOICE_VERSION += 1
 
     @staticmethod
     def resolve_voice(voice: str, fallback_voice: typing.Optional[str] = None) -> str:
         """Resolve a voice or language based on aliases"""
-        _VOICE_ALIASES = TTSBase.voice_aliases
-        _TTSList = TTSBase._TTSList
+        return TTSBase._resolve_voice(voice, fallback_voice, _VOICE_VERSION)
+
+    @staticmethod
+    async def resolve_voice_async(
+        voice: str, fallback_voice: typing.Optional[str] = None
+    ) -> str:
+        """Like resolve_voice, but creates pending TTS systems off the loop"""
+        if TTSBase._has_pending():
+            await TTSBase._wait_for_probes()
+            return await asyncio.to_thread(TTSBase.resolve_voice, voice, fallback_voice)
+        return TTSBase.resolve_voice(voice, fallback_voice)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def _resolve_voice(
+        voice: str, fallback_voice: typing.Optional[str], _version: int
+    ) -> str:
         original_voice = voice
 
-        if "#" in voice:
-            # Remove speaker id
-            # tts:voice#speaker_id
-            voice, _speaker_id = voice.split("#", maxsplit=1)
+        # Remove speaker id
+        # tts:voice#speaker_id
+        voice = voice.partition("#")[0]
+        has_tts = ":" in voice
 
         # Resolve voices in order:
         # 1. Aliases in order of preference
@@ -155,26 +546,93 @@ class TTSBase(metaclass=ABCMeta):
 
         fallback_voices.append(original_voice)
 
-        alias_key = voice.lower()
-        if alias_key not in _VOICE_ALIASES:
-            # en-US -> en
-            alias_key = re.split(r"[-_]", alias_key, maxsplit=1)[0]
+        # Voices are added under their locale and language, so the language
+        # prefix (en-US -> en) is only needed for locales without voices
+        alias_key = voice.lower() if has_tts else _alias_key(voice)
+
+        def find_aliases() -> typing.Dict[str, None]:
+            # Replaced as pending TTS systems are created
+            _VOICE_ALIASES = TTSBase.voice_aliases
+            aliases = _VOICE_ALIASES.get(alias_key)
+            if aliases is None:
+                aliases = _VOICE_ALIASES.get(_alias_keys(alias_key)[-1], {})
+            return aliases
 
-        if ":" not in voice:
+        if not has_tts:
+            TTSBase._create_pending_until(_alias_keys(alias_key))
             fallback_voices.append(f"espeak:{voice}")
 
-        for preferred_voice in itertools.chain(_VOICE_ALIASES[alias_key], fallback_voices):
-            tts, _voice_id = preferred_voice.split(":", maxsplit=1)
-            if tts in _TTSList:
-                # If TTS system is loaded, assume voice will be present
-                return preferred_voice
+        aliases = find_aliases()
+
+        preferred_voice = _pick(
+            itertools.chain(aliases, fallback_voices), TTSBase._is_available
+        )
+        if preferred_voice is not None:
+            return preferred_voice
 
         raise ValueError(f"Cannot resolve voice: {voice}")
 
-def async_run_and_get(coro):
-    task = _LOOP.create_task(coro)
-    # pending = asyncio.all_tasks(loop)
-    _LOOP.run_until_complete(task)
+def _pick(
+    candidates: typing.Iterable[str], is_available: typing.Callable[[str], bool]
+) -> typing.Optional[str]:
+    """Get the first tts:voice candidate whose TTS system is available"""
+    for candidate in candidates:
+        tts, sep, _voice_id = candidate.partition(":")
+        if sep and is_available(tts):
+            # If TTS system is available, assume voice will be present
+            return candidate
+
+    return None
+
+def setSayCacheSize(
+    max_entries: typing.Optional[int] = None, max_bytes: typing.Optional[int] = None
+):
+    """Set how many spoken lines, and bytes of them, are kept in memory (0 disables)"""
+    with TTSBase._say_cache_lock:
+        if max_entries is not None:
+            TTSBase.say_cache_max_entries = max_entries
+        if max_bytes is not None:
+            TTSBase.say_cache_max_bytes = max_bytes
+        _trim_say_cache()
+
+def _trim_say_cache():
+    _say_cache = TTSBase._say_cache
+    while _say_cache and (
+        (len(_say_cache) > max(0, TTSBase.say_cache_max_entries))
+        or (TTSBase._say_cache_bytes > max(0, TTSBase.say_cache_max_bytes))
+    ):
+        _key, (samples, _sample_rate) = _say_cache.popitem(last=False)
+        TTSBase._say_cache_bytes -= samples.nbytes
 
-    # asyncio.get_running_loop().run_until_complete(task)
-    return task.result()
+def async_run_and_get(coro):
+    """Run a coroutine to completion from synchronous code and return its result."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        # No loop running in this thread
+        return _run_in_new_loop(coro)
+
+    # A running loop can't be blocked on, so use a fresh one in another thread
+    results: queue.Queue = queue.Queue(maxsize=1)
+
+    def run():
+        try:
+            results.put((True, _run_in_new_loop(coro)))
+        except BaseException as err:  # pylint: disable=broad-except
+            results.put((False, err))
+
+    thread = threading.Thread(target=run, name="async_run_and_get", daemon=True)
+    thread.start()
+    thread.join()
+
+    succeeded, result = results.get()
+    if not succeeded:
+        raise result
+    return result
+
+def _run_in_new_loop(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
@@ -1,29 +1,78 @@
+import asyncio
+import concurrent.futures
+import importlib
 import typing
 import json
 import logging
 import shutil
+import threading
 
-from .to_wav import setCacheDir
+from .to_wav import getLineConcurrency, setCacheDir, setLineConcurrency, setMemCacheSize
 
 from .tts import (
   TTSBase,
   CoquiTTS,
   EspeakTTS,
+  async_run_and_get,
+  setSayCacheSize,
 )
 
 from .logger import LOGGER as _LOGGER
 
+def _read_text(path) -> typing.Optional[str]:
+  if path.is_file():
+      return path.read_text().strip()
+  return None
+
+def _coqui_available() -> bool:
+  try:
+      importlib.import_module("TTS")
+      return True
+  except Exception:
+      if _LOGGER.isEnabledFor(logging.DEBUG):
+          _LOGGER.exception("coqui-tts")
+  return False
+
+def _probe_in_background(name: str, func, *args) -> concurrent.futures.Future:
+  """Run a blocking engine check in a daemon thread, None if it fails.
+
+  The thread outlives initTTS, so the result can be awaited on first use.
+  """
+  future: concurrent.futures.Future = concurrent.futures.Future()
+
+  def run():
+      try:
+          future.set_result(func(*args))
+      except Exception:
+          _LOGGER.exception("%s probe", name)
+          future.set_result(None)
+
+  threading.Thread(target=run, name=f"{name}_probe", daemon=True).start()
+  return future
+
 def initTTS(args, _DIR):
+  return async_run_and_get(initTTS_async(args, _DIR))
+
+async def initTTS_async(args, _DIR):
 
   _VOICES_DIR = _DIR / "voices"
 
   TTSBase.langs = args.languages.split(',')
 
+  # Probe the engines while reading config. Importing Coqui-TTS takes seconds,
+  # so that probe is only waited for when Coqui-TTS is first used.
+  espeak_probe = None
+  if not args.no_espeak:
+      espeak_probe = _probe_in_background("espeak", shutil.which, "espeak-ng")
+  coqui_probe = None
+  if not args.no_coqui:
+      coqui_probe = _probe_in_background("coqui-tts", _coqui_available)
+
   # Get default language
-  _DEFAULT_LANGUAGE = None
-  _path = _DIR / "LANGUAGE"
-  if _path.is_file():
-      _DEFAULT_LANGUAGE = _path.read_text().strip()
+  _DEFAULT_LANGUAGE, _s = await asyncio.gather(
+      asyncio.to_thread(_read_text, _DIR / "LANGUAGE"),
+      asyncio.to_thread(_read_text, _DIR / "PREFERRED_VOICES"),
+  )
 
   if not _DEFAULT_LANGUAGE:
       if args.language:
@@ -37,50 +86,79 @@ def initTTS(args, _DIR):
   _LOGGER.debug("Default language: %s", _DEFAULT_LANGUAGE)
   TTSBase.default_lang = _DEFAULT_LANGUAGE
 
-  _PREFERRED_VOICES: typing.Optional[typing.Dict[str, typing.Any]] = None
-  _path = _DIR / "PREFERRED_VOICES"
-  if _path.is_file():
-      _s = _path.read_text().strip()
-      if _s:
-          try:
-              _PREFERRED_VOICES = json.loads(_s)
-          except Exception as e:
-              _LOGGER.error("Load PREFERRED_VOICES Error: %s", e)
-  if type(_PREFERRED_VOICES) is list:
-      for item in _PREFERRED_VOICES: # type: ignore
-          if type(item) is str:
-              lang, voice = item.split(' ')
-              TTSBase.voice_aliases[lang].insert(0, voice)
-          elif type(item) is dict:
-              TTSBase.voice_aliases[item.get("lang")].insert(0, item.get("voice")) # type: ignore
+  _PREFERRED_VOICES: typing.Any = None
+  if _s:
+      try:
+          _PREFERRED_VOICES = json.loads(_s)
+      except Exception as e:
+          _LOGGER.error("Load PREFERRED_VOICES Error: %s", e)
+  add_preferred_voice = TTSBase.add_preferred_voice
+  if isinstance(_PREFERRED_VOICES, list):
+      for item in _PREFERRED_VOICES:
+          lang, voice = None, None
+          if isinstance(item, str):
+              # "lang tts:voice"
+              lang, _sep, voice = item.partition(' ')
+              voice = voice.strip()
+          elif isinstance(item, dict):
+              lang, voice = item.get("lang"), item.get("voice")
+
+          if lang and voice and isinstance(lang, str) and isinstance(voice, str):
+              add_preferred_voice(lang, voice)
+          else:
+              _LOGGER.warning("Skipping PREFERRED_VOICES entry without lang and voice: %s", item)
   if args.preferred_voice:
       for pref_lang, pref_voice in args.preferred_voice:
-          TTSBase.voice_aliases[pref_lang].insert(0, pref_voice)
-
-  _LOGGER.debug("preferred_voices: %s", json.dumps(TTSBase.voice_aliases))
-
-  setCacheDir(args.cache)
-
+          add_preferred_voice(pref_lang, pref_voice)
+
+  TTSBase.clear_voice_cache()
+
+  if _LOGGER.isEnabledFor(logging.DEBUG):
+      _LOGGER.debug(
+          "preferred_voices: %s",
+          json.dumps({lang: list(voices) for lang, voices in TTSBase.voice_aliases.items()}),
+      )
+
+  setCacheDir(
+      args.cache,
+      max_bytes=getattr(args, "cache_max_size", None),
+      ttl=getattr(args, "cache_ttl", None),
+  )
+  mem_cache_size = getattr(args, "mem_cache_size", None)
+  if mem_cache_size is not None:
+      setMemCacheSize(mem_cache_size)
+  line_concurrency = getattr(args, "line_concurrency", None)
+  if line_concurrency is not None:
+      setLineConcurrency(line_concurrency)
+  say_cache_size = getattr(args, "say_cache_size", None)
+  say_cache_bytes = getattr(args, "say_cache_bytes", None)
+  if (say_cache_size is not None) or (say_cache_bytes is not None):
+      setSayCacheSize(say_cache_size, max_bytes=say_cache_bytes)
+
+  # Registered in a fixed order (the order of voice preference) once probed
   # espeak
-  if (not args.no_espeak) and shutil.which("espeak-ng"):
-      EspeakTTS.register()
+  if (espeak_probe is not None) and (await asyncio.wrap_future(espeak_probe)):
+      # espeak-ng subprocesses run side by side, as many as the lines of one
+      # request unless limited further
+      EspeakTTS.register(
+          lazy=True,
+          max_concurrency=getattr(args, "espeak_concurrency", None) or getLineConcurrency(),
+      )
   # Coqui-TTS
-  if not args.no_coqui:
-      try:
-          import TTS  # noqa: F401
-
-          coqui_available = True
-      except Exception:
-          coqui_available = False
-
-          if log_level <= logging.DEBUG:
-              _LOGGER.exception("coqui-tts")
-
-      if coqui_available:
-          CoquiTTS.register(models_dir=(_VOICES_DIR / "coqui-tts"))
+  if coqui_probe is not None:
+      CoquiTTS.register(
+          lazy=True,
+          probe=coqui_probe,
+          models_dir=(_VOICES_DIR / "coqui-tts"),
+          max_concurrency=getattr(args, "coqui_concurrency", None) or 1,
+      )
 
   # asyncio.run(_init())
 
-  _LOGGER.debug("Loaded TTS systems: %s", ", ".join(TTSBase._TTSList.keys()))
+  # Created on first use, or by TTSBase.prefetch(), and dropped then if the
+  # probe failed
+  _LOGGER.debug("Registered TTS systems: %s", ", ".join(TTSBase._TTSList.keys()))
 
-  return { "defaultLang": _DEFAULT_LANGUAGE, "TTSList": TTSBase._TTSList}
+  # TTS systems are listed through items_async() (or TTSBase.items()), which
+  # creates them and leaves out the unavailable ones
+  return { "defaultLang": _DEFAULT_LANGUAGE, "TTSItems": TTSBase.items_async}